@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Shared helper for reading text out of Gemini responses
+"""
+
+def response_text(response) -> str:
+    """Text of a Gemini response, or '' if the model returned no text part"""
+    try:
+        return response.text
+    except ValueError:
+        # .text only handles one candidate with exactly one text part; otherwise
+        # join the first candidate's parts (blocked responses have none)
+        if not response.candidates:
+            return ''
+        return ''.join(part.text for part in response.candidates[0].content.parts)
@@ -5,7 +5,6 @@ Simple Gemini test to check basic connectivity
 
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 load_dotenv()
 
@@ -13,6 +12,7 @@ api_key = os.getenv('GEMINI_API_KEY')
 print(f"🔑 API Key: {'Found' if api_key else 'Missing'}")
 
 if api_key:
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     
     # Just try one model
@@ -59,6 +59,7 @@ export interface QAAnalysisRequest {
     checkSpacing?: boolean;
     checkTypography?: boolean;
     checkAccessibility?: boolean;
+    useAI?: boolean;
   };
   analysisOptions: {
     checkContrast: boolean;
@@ -66,6 +67,7 @@ export interface QAAnalysisRequest {
     checkSpacing: boolean;
     checkTypography: boolean;
     checkAccessibility: boolean;
+    useAI?: boolean;
   };
 }
 
@@ -5,7 +5,8 @@ Quick test script for Gemini API integration
 
 import os
 from dotenv import load_dotenv
-import google.generativeai as genai
+
+import gemini_text
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +20,7 @@ def test_gemini():
         return False
     
     # Configure Gemini
+    import google.generativeai as genai
     genai.configure(api_key=api_key)
     
     # First, list available models
@@ -27,7 +29,7 @@ def test_gemini():
         models = genai.list_models()
         generation_models = []
         for model in models:
-            if hasattr(model, 'supported_generation_methods') and 'generateContent' in model.supported_generation_methods:
+            if 'generateContent' in model.supported_generation_methods:
                 print(f"   ✅ {model.name}")
                 generation_models.append(model.name)
         
@@ -55,22 +57,7 @@ def test_gemini():
             # Simple test
             response = model.generate_content("Hello! Respond with 'Gemini AI is working!'")
             
-            # Handle different response formats more carefully
-            try:
-                if hasattr(response, 'text') and response.text:
-                    response_text = response.text
-                elif hasattr(response, 'parts') and response.parts:
-                    response_text = ''.join([part.text for part in response.parts if hasattr(part, 'text')])
-                elif hasattr(response, 'candidates') and response.candidates:
-                    candidate = response.candidates[0]
-                    if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                        response_text = ''.join([part.text for part in candidate.content.parts if hasattr(part, 'text')])
-                    else:
-                        response_text = str(candidate)
-                else:
-                    response_text = str(response)
-            except Exception as e:
-                response_text = f"Response parsing error: {str(e)}"
+            response_text = gemini_text.response_text(response)
                 
             print(f"✅ Success! Response: {response_text}")
             
@@ -85,21 +72,7 @@ def test_gemini():
             """
             
             design_response = model.generate_content(design_prompt)
-            try:
-                if hasattr(design_response, 'text') and design_response.text:
-                    design_text = design_response.text
-                elif hasattr(design_response, 'parts') and design_response.parts:
-                    design_text = ''.join([part.text for part in design_response.parts if hasattr(part, 'text')])
-                elif hasattr(design_response, 'candidates') and design_response.candidates:
-                    candidate = design_response.candidates[0]
-                    if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                        design_text = ''.join([part.text for part in candidate.content.parts if hasattr(part, 'text')])
-                    else:
-                        design_text = str(candidate)
-                else:
-                    design_text = str(design_response)
-            except Exception as e:
-                design_text = f"Response parsing error: {str(e)}"
+            design_text = gemini_text.response_text(design_response)
                 
             print(f"🎨 Design analysis response: {design_text[:200]}...")
             